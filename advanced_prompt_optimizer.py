@@ -2,12 +2,30 @@ import anthropic
 import os
 import json
 import asyncio
+from mutation_engine import MutationEngine
+
+_client = None
+
+
+def get_client():
+    """Anthropic client shared by every judge in this process, created on first use"""
+    global _client
+    if _client is None:
+        _client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+    return _client
+
 
 class AdvancedPromptOptimizer:
     """Advanced prompt optimizer using LLM-as-a-Judge for sophisticated reward calculation"""
     
-    def __init__(self):
+    def __init__(self, ledger=None):
         self.client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        self.ledger = ledger  # Optional CostLedger for token/cost accounting
+        self.mutation_engine = MutationEngine(model="claude-3-5-sonnet-20241022", ledger=ledger)
+    
+    async def mutate(self, parents, n_children=4):
+        """Children of the top-k (prompt, score, dimensions) parents, see MutationEngine.mutate"""
+        return await self.mutation_engine.mutate(parents, n_children=n_children)
     
     async def evolve_prompts(self, best_prompt, worst_prompt, best_score, worst_score):
         """Create evolved prompts using advanced analysis"""
@@ -35,6 +53,8 @@ Return only the 2 prompts, one per line."""
             max_tokens=500,
             messages=[{"role": "user", "content": evolution_request}]
         )
+        if self.ledger:
+            self.ledger.record(response, stage="evolution")
         
         evolved_prompts = [
             line.strip().strip('"') 
@@ -48,8 +68,9 @@ Return only the 2 prompts, one per line."""
 class LLMJudge:
     """LLM-as-a-Judge system for advanced response evaluation"""
     
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+    def __init__(self, ledger=None):
+        self.client = get_client()
+        self.ledger = ledger
     
     async def evaluate_response(self, question, response, system_prompt=""):
         """Comprehensive evaluation using Claude as a judge"""
@@ -98,6 +119,8 @@ Format your response as JSON:
                 max_tokens=800,
                 messages=[{"role": "user", "content": evaluation_prompt}]
             )
+            if self.ledger:
+                self.ledger.record(response, stage="judge", prompt=system_prompt)
             
             # Parse JSON response
             evaluation_text = response.content[0].text.strip()
@@ -129,8 +152,9 @@ Format your response as JSON:
 class CompariativeJudge:
     """LLM judge that compares two responses directly"""
     
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+    def __init__(self, ledger=None):
+        self.client = get_client()
+        self.ledger = ledger
     
     async def compare_responses(self, question, response_a, response_b, prompt_a="", prompt_b=""):
         """Compare two responses and determine which is better"""
@@ -170,6 +194,8 @@ Provide your evaluation in JSON format:
                 max_tokens=500,
                 messages=[{"role": "user", "content": comparison_prompt}]
             )
+            if self.ledger:
+                self.ledger.record(response, stage="judge")
             
             # Parse JSON response
             eval_text = response.content[0].text.strip()
@@ -188,8 +214,51 @@ Provide your evaluation in JSON format:
             return {"winner": "TIE", "confidence": 0.5, "reasoning": str(e), "scores": {"response_a": 0.5, "response_b": 0.5}}
 
 
+# Baseline every comparative score is measured against; its answers are generated once per question
+REFERENCE_SYSTEM_PROMPT = "You are a helpful AI assistant."
+REFERENCE_MODEL = "claude-3-haiku-20240307"
+
+
+class ComparativeReward:
+    """Scores each response head-to-head against a fixed reference answer for its question
+
+    The reference is the answer to the baseline `reference_prompt`, generated once per
+    question at temperature 0 and never replaced, so every candidate is judged against
+    the same opponent and the scores can be ranked against each other.
+    """
+
+    def __init__(self, reference_prompt=REFERENCE_SYSTEM_PROMPT, model=REFERENCE_MODEL):
+        self.judge = CompariativeJudge()
+        self.reference_prompt = reference_prompt
+        self.model = model
+        self.references = {}  # question -> reference answer
+
+    def reference(self, question, ledger=None):
+        """The baseline prompt's answer to `question`, generated on first use"""
+        if question not in self.references:
+            response = get_client().messages.create(
+                model=self.model,
+                max_tokens=500,
+                temperature=0,
+                system=self.reference_prompt,
+                messages=[{"role": "user", "content": question}]
+            )
+            if ledger:
+                ledger.record(response, stage="reference", prompt=self.reference_prompt)
+            self.references[question] = response.content[0].text
+        return self.references[question]
+
+    async def __call__(self, response, question, system_prompt="", ledger=None):
+        reference = self.reference(question, ledger=ledger)
+
+        self.judge.ledger = ledger
+        comparison = await self.judge.compare_responses(question, reference, response, self.reference_prompt, system_prompt)
+        print(f"⚖️  Comparative judge vs. reference: {comparison['winner']} ({comparison['reasoning'][:80]}...)")
+        return float(comparison["scores"]["response_b"])
+
+
 # Main evaluation function to use in run_client.py
-async def calculate_advanced_reward(response, question, system_prompt="", method="individual"):
+async def calculate_advanced_reward(response, question, system_prompt="", method="individual", ledger=None, dimensions=None):
     """
     Advanced reward calculation using LLM-as-a-Judge
     
@@ -198,17 +267,25 @@ async def calculate_advanced_reward(response, question, system_prompt="", method
         question: The original question
         system_prompt: The system prompt used
         method: "individual" for single evaluation, "comparative" for head-to-head comparison
+        ledger: Optional CostLedger that records the judge's token usage
+        dimensions: Optional dict filled with the per-dimension scores ({"clarity": 14, ...})
     
     Returns:
         float: Score between 0.0 and 1.0
     """
     
     if method == "individual":
-        judge = LLMJudge()
+        judge = LLMJudge(ledger=ledger)
         evaluation = await judge.evaluate_response(question, response, system_prompt)
         
         # Print detailed breakdown for visibility
         if "detailed_evaluation" in evaluation and "error" not in evaluation["detailed_evaluation"]:
+            if dimensions is not None:
+                dimensions.update({
+                    name: value["score"]
+                    for name, value in evaluation["detailed_evaluation"].items()
+                    if isinstance(value, dict) and "score" in value
+                })
             details = evaluation["detailed_evaluation"]
             print(f"\n📊 LLM Judge Evaluation:")
             print(f"   🎯 Accuracy: {details['accuracy']['score']}/20 - {details['accuracy']['explanation']}")
@@ -224,13 +301,13 @@ async def calculate_advanced_reward(response, question, system_prompt="", method
     else:
         # For comparative method, you'd need to store previous responses to compare against
         # This is more complex and would require modifications to the main flow
-        judge = LLMJudge()
+        judge = LLMJudge(ledger=ledger)
         evaluation = await judge.evaluate_response(question, response, system_prompt)
         return evaluation["score"]
 
 
 # Simplified version for easier integration
-async def simple_llm_judge_reward(response, question):
+async def simple_llm_judge_reward(response, question, ledger=None):
     """Simplified LLM judge for easy integration"""
     
     judge_prompt = f"""Rate this AI response on a scale of 0-100:
@@ -248,13 +325,13 @@ Consider:
 Respond with just the number (0-100):"""
 
     try:
-        client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
-        
-        response = client.messages.create(
+        response = get_client().messages.create(
             model="claude-3-haiku-20240307",  # Faster model for simple scoring
             max_tokens=50,
             messages=[{"role": "user", "content": judge_prompt}]
         )
+        if ledger:
+            ledger.record(response, stage="judge")
         
         # Extract number from response
         score_text = response.content[0].text.strip()
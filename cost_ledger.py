@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+
+# USD per million tokens, from Anthropic's published pricing
+MODEL_PRICING = {
+    "claude-3-haiku-20240307": {"input": 0.25, "output": 1.25, "cache_write": 0.30, "cache_read": 0.03},
+    "claude-3-5-sonnet-20241022": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+}
+
+
+def prompt_id(prompt):
+    """Short stable id for a system prompt, used to attribute costs"""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+
+
+def usage_cost(model, input_tokens=0, output_tokens=0, cache_creation_input_tokens=0, cache_read_input_tokens=0):
+    """Dollar cost of one call; unknown models are priced at 0.0"""
+    pricing = MODEL_PRICING.get(model)
+    if not pricing:
+        return 0.0
+
+    return (
+        input_tokens * pricing["input"]
+        + output_tokens * pricing["output"]
+        + cache_creation_input_tokens * pricing["cache_write"]
+        + cache_read_input_tokens * pricing["cache_read"]
+    ) / 1_000_000
+
+
+class CostLedger:
+    """Records token usage and dollar cost per stage, prompt and generation"""
+
+    def __init__(self, budget_usd=None):
+        if budget_usd is not None and budget_usd <= 0:
+            raise ValueError(f"budget_usd must be positive or None for no limit, got {budget_usd}")
+        self.budget_usd = budget_usd
+        self.generation = 0  # Set by the evolution loop, stamped on every entry
+        self.entries = []
+
+    def record(self, response, stage, model=None, prompt=None):
+        """Record the `usage` of an Anthropic `messages.create` response"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+
+        model = model or getattr(response, "model", "unknown")
+        tokens = {
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        }
+        entry = {
+            "stage": stage,
+            "model": model,
+            **tokens,
+            "cost_usd": usage_cost(model, **tokens),
+            "prompt_id": prompt_id(prompt) if prompt else None,
+            "generation": self.generation,
+        }
+        self.entries.append(entry)
+        return entry
+
+    def add_entries(self, entries, prompt=None):
+        """Merge entries reported by a client rollout, attributing them to `prompt`"""
+        for entry in entries or []:
+            entry = dict(entry)
+            if prompt:
+                entry["prompt_id"] = prompt_id(prompt)
+            entry["generation"] = self.generation
+            self.entries.append(entry)
+
+    @property
+    def total_cost(self):
+        return sum(entry["cost_usd"] for entry in self.entries)
+
+    @property
+    def exhausted(self):
+        """True once the hard budget has been reached"""
+        return self.budget_usd is not None and self.total_cost >= self.budget_usd
+
+    def summary(self):
+        """Totals broken down by stage, prompt and generation"""
+
+        def totals(key):
+            grouped = {}
+            for entry in self.entries:
+                group = grouped.setdefault(str(entry.get(key)), {
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cache_creation_input_tokens": 0,
+                    "cache_read_input_tokens": 0,
+                    "cost_usd": 0.0,
+                    "calls": 0,
+                })
+                for field in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "cost_usd"):
+                    group[field] += entry.get(field, 0)
+                group["calls"] += 1
+            return grouped
+
+        return {
+            "total_cost_usd": self.total_cost,
+            "budget_usd": self.budget_usd,
+            "budget_exhausted": self.exhausted,
+            "by_stage": totals("stage"),
+            "by_prompt": totals("prompt_id"),
+            "by_generation": totals("generation"),
+        }
+
+    def write_report(self, path):
+        """Write the summary plus every individual entry as JSON"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({**self.summary(), "entries": self.entries}, f, indent=2)
+
+
+def write_run_report(run_dir, results, evolved, late, ranked, metrics, operators, ledger):
+    """Write scores.json and cost_report.json for one evolution run into `run_dir`
+
+    `results`, `evolved` and `late` are (prompt, score) lists, `ranked` both
+    generations best first, and `operators` maps evolved prompts to the mutation
+    operator that produced them.
+    """
+    def entry(prompt, score):
+        return {"prompt": prompt, "score": score, "operator": operators.get(prompt), **metrics.get(prompt, {})}
+
+    os.makedirs(run_dir, exist_ok=True)
+    with open(os.path.join(run_dir, "scores.json"), "w") as f:
+        json.dump({
+            "initial": [{"prompt": p, "score": s, **metrics.get(p, {})} for p, s in results],
+            "evolved": [entry(p, s) for p, s in evolved],
+            "late": [{"prompt": p, "score": s} for p, s in late],
+            "winner": entry(*ranked[0]) if ranked else None,
+        }, f, indent=2)
+    ledger.write_report(os.path.join(run_dir, "cost_report.json"))
+    print(f"\n💰 Total cost: ${ledger.total_cost:.4f} (report in {run_dir})")
+
+
+def budget_from_env():
+    """Hard budget in USD from EVOLUTION_BUDGET_USD, or None for no limit"""
+    value = os.environ.get("EVOLUTION_BUDGET_USD")
+    if not value:
+        return None
+    if float(value) <= 0:
+        raise ValueError(f"EVOLUTION_BUDGET_USD must be positive (unset it for no limit), got {value}")
+    return float(value)
@@ -1,18 +1,40 @@
 import asyncio
+import os
+import time
 from agentlightning.server import AgentLightningServer
-from agentlightning.types import NamedResources, PromptTemplate
-from advanced_prompt_optimizer import AdvancedPromptOptimizer
+from agentlightning.types import NamedResources
+from cost_ledger import CostLedger, budget_from_env, write_run_report
+from rollout_stream import RolloutStream, evaluate_prompts, late_rollout_recorder
+from registry import optimizer_from_env
+from objectives import rank_prompts
 
-async def run_evolution():
-    """Clean evolution process with 5 prompts"""
+async def run_evolution(budget_usd=None, top_k=2, n_children=4, server=None, on_rollout=None, max_in_flight=None, ranking="weighted", weights=None):
+    """Clean evolution process with 5 prompts
+    
+    Pass an already started `server` to reuse it (it is then left running), and
+    `on_rollout` to be called with every completed rollout. Up to `max_in_flight`
+    prompts (default: all) are evaluated at once, scored in finish order; with a
+    budget, fewer are queued so the remaining budget covers them.
+    Candidates are ranked by `ranking` ("quality", "weighted" or "pareto"), trading
+    judge quality against generation latency and token cost using `weights`.
+    """
     
     print("🧬 PROMPT EVOLUTION SYSTEM")
     print("=" * 40)
     
     # Setup
-    server = AgentLightningServer(host="127.0.0.1", port=9997)
-    optimizer = AdvancedPromptOptimizer()
-    await server.start()
+    owns_server = server is None
+    if owns_server:
+        server = AgentLightningServer(host="127.0.0.1", port=9997)
+    ledger = CostLedger(budget_usd=budget_usd if budget_usd is not None else budget_from_env())
+    optimizer = optimizer_from_env("advanced", ledger=ledger)
+    run_dir = os.path.join("runs", time.strftime("%Y%m%d-%H%M%S"))
+    if owns_server:
+        await server.start()
+    late_results = []
+    task_prompts = {}
+    metrics = {}  # prompt -> quality, latency and token counts
+    stream = RolloutStream(server, timeout=20, on_late=late_rollout_recorder(ledger, task_prompts, late_results))
     print("✅ System ready")
     
     # 5 prompts with clear quality differences (100+ words each)
@@ -38,76 +60,88 @@ async def run_evolution():
     print(f"\n📝 Testing {len(prompts)} prompts")
     print(f"🎯 Question: '{test_question}'")
     
-    # Test all prompts
-    results = []
-    for i, prompt in enumerate(prompts, 1):
-        print(f"\n🔬 Testing Prompt {i}/5")
-        
-        # Send to client
-        resources = {"system_prompt": PromptTemplate(template=prompt, engine="f-string")}
-        await server.update_resources(resources)
-        task_id = await server.queue_task(sample={"prompt": test_question}, mode="train")
-        
-        # Get result
-        rollout = await server.poll_completed_rollout(task_id, timeout=20)
-        score = rollout.final_reward if rollout else 0.0
-        
-        results.append((prompt, score))
-        print(f"   Score: {score:.2f}")
+    # Test all prompts, scored as they finish
+    print(f"\n🔬 Testing {len(prompts)} prompts")
+    results = await evaluate_prompts(
+        stream, prompts, test_question, ledger=ledger,
+        max_in_flight=max_in_flight, on_rollout=on_rollout, task_prompts=task_prompts, metrics=metrics,
+    )
     
     # Show results
-    results.sort(key=lambda x: x[1], reverse=True)
-    print(f"\n📊 RESULTS:")
+    results = rank_prompts(results, metrics, ranking=ranking, weights=weights)
+    print(f"\n📊 RESULTS (ranked by {ranking}):")
     for i, (prompt, score) in enumerate(results, 1):
         preview = prompt[:50].replace('\n', ' ') + "..."
-        print(f"   {i}. {score:.2f} - {preview}")
+        m = metrics.get(prompt, {})
+        serving = f" [{m['latency_s']:.2f}s, {m['input_tokens']}+{m['output_tokens']} tok]" if m.get("latency_s") is not None else ""
+        print(f"   {i}. {score:.2f}{serving} - {preview}")
     
-    best_prompt, best_score = results[0]
-    worst_prompt, worst_score = results[-1]
-    
-    print(f"\n🏆 Best: {best_score:.2f}")
-    print(f"📉 Worst: {worst_score:.2f}")
+    if results:
+        best_prompt, best_score = results[0]
+        worst_prompt, worst_score = results[-1]
+        
+        print(f"\n🏆 Best: {best_score:.2f}")
+        print(f"📉 Worst: {worst_score:.2f}")
     
     # Evolution
-    if best_score > worst_score + 0.1:  # Only evolve if clear difference
+    evolved_results = []
+    ranked = results  # Both generations once evolved prompts are tested
+    operators = {}  # Child prompt -> mutation operator that produced it
+    if not results:
+        print(f"\n⏭️  No prompt was tested, skipping evolution")
+    elif ledger.exhausted:
+        print(f"\n💸 Budget reached, skipping evolution")
+    elif max(s for _, s in results) > min(s for _, s in results) + 0.1:  # Only evolve if clear difference
         print(f"\n🧬 EVOLUTION")
-        new_prompts = await optimizer.evolve_prompts(best_prompt, worst_prompt, best_score, worst_score)
+        ledger.generation = 1
+        parents = [(p, s, metrics.get(p, {}).get("dimensions")) for p, s in results[:top_k]]
+        children = await optimizer.mutate(parents, n_children=n_children)
+        new_prompts = [child["prompt"] for child in children]
+        operators = {child["prompt"]: child["operator"] for child in children}
         
         if new_prompts:
             print(f"✅ Created {len(new_prompts)} evolved prompts")
+            for i, child in enumerate(children, 1):
+                print(f"   {i}. [{child['operator']}] {child['prompt'][:50]}...")
             
             # Test evolved prompts
             print(f"\n🧪 Testing evolved prompts")
-            best_evolved_score = 0.0
+            evolved_results = await evaluate_prompts(
+                stream, new_prompts, test_question, ledger=ledger,
+                max_in_flight=max_in_flight, on_rollout=on_rollout, task_prompts=task_prompts, metrics=metrics,
+            )
+            # Rank both generations together so the winner is picked on the same objective
+            ranked = rank_prompts(results + evolved_results, metrics, ranking=ranking, weights=weights)
+            for i, (evolved_prompt, evolved_score) in enumerate(evolved_results, 1):
+                print(f"   Evolved {i} ({operators[evolved_prompt]}): {evolved_score:.2f} (objective {metrics[evolved_prompt]['objective']:.3f})")
             
-            for i, evolved_prompt in enumerate(new_prompts, 1):
-                resources = {"system_prompt": PromptTemplate(template=evolved_prompt, engine="f-string")}
-                await server.update_resources(resources)
-                task_id = await server.queue_task(sample={"prompt": test_question}, mode="train")
-                
-                rollout = await server.poll_completed_rollout(task_id, timeout=20)
-                evolved_score = rollout.final_reward if rollout else 0.0
-                
-                print(f"   Evolved {i}: {evolved_score:.2f}")
-                best_evolved_score = max(best_evolved_score, evolved_score)
-            
-            # Show improvement
-            improvement = best_evolved_score - best_score
-            if improvement > 0:
-                print(f"\n🎉 IMPROVEMENT: +{improvement:.2f} ({improvement/best_score*100:+.1f}%)")
+            # Show improvement: an evolved prompt ranks first
+            winner_prompt, winner_score = ranked[0]
+            best_initial = next(p for p, _ in ranked if p not in operators)
+            gain = metrics[winner_prompt]["objective"] - metrics[best_initial]["objective"]
+            print(f"\n🏆 Generation winner ({ranking}): {winner_score:.2f} - {winner_prompt[:50]}...")
+            if winner_prompt in operators:
+                print(f"🎉 IMPROVEMENT: {operators[winner_prompt]} child beats the best initial prompt (objective {gain:+.3f})")
             else:
-                print(f"\n📊 No improvement this round")
+                print(f"📊 No improvement this round, the best initial prompt still ranks first")
         else:
             print("❌ Evolution failed")
     else:
         print(f"\n⏭️  Scores too similar, skipping evolution")
     
+    # Late rollouts still cost money: wait for them before writing the report
+    await stream.drain()
+    await stream.aclose()
+    write_run_report(run_dir, results, evolved_results, late_results, ranked, metrics, operators, ledger)
+    
     # Cleanup
-    await server.stop()
+    if owns_server:
+        await server.stop()
     print(f"\n✅ Complete")
 
 if __name__ == "__main__":
     print("⚠️  Start 'python run_client.py' in another terminal first!")
+    print("   (or run 'python orchestrator.py' to start everything headless)")
     input("Press Enter when client is ready...")
     
     asyncio.run(run_evolution())
\ No newline at end of file
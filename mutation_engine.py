@@ -0,0 +1,184 @@
+import asyncio
+import os
+import re
+
+# The 5 dimensions scored by LLMJudge, used for targeted rewrites
+RUBRIC_DIMENSIONS = ["accuracy", "clarity", "completeness", "helpfulness", "structure"]
+
+OPERATORS = ["crossover", "targeted_rewrite", "compression", "expansion"]
+
+
+def weakest_dimension(dimensions):
+    """Name of the lowest scoring rubric dimension, or None if unknown
+
+    `dimensions` is LLMJudge's detailed evaluation ({"clarity": {"score": 12}, ...})
+    or a plain {dimension: score} mapping.
+    """
+    scores = {}
+    for name in RUBRIC_DIMENSIONS:
+        value = (dimensions or {}).get(name)
+        if isinstance(value, dict):
+            value = value.get("score")
+        if isinstance(value, (int, float)):
+            scores[name] = value
+
+    return min(scores, key=scores.get) if scores else None
+
+
+def _normalize(prompt):
+    """Key used to deduplicate prompts that differ only in case or whitespace"""
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+class MutationEngine:
+    """Runs several mutation operators on the top-k prompts concurrently
+
+    Crossover makes one call over all parents; every other operator makes one call
+    per parent, so k parents and all 4 operators allow up to 3k + 1 calls. Only as
+    many run as are needed for the requested children plus `slack` spare prompts
+    (to replace duplicates), taken round-robin over parents and operators.
+    """
+
+    def __init__(self, model="claude-3-5-sonnet-20241022", operators=None, ledger=None, min_length=30, slack=1, client=None):
+        if client is None:
+            import anthropic
+            client = anthropic.AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        self.client = client
+        self.model = model
+        self.operators = list(operators or OPERATORS)
+        self.ledger = ledger  # Optional CostLedger for token/cost accounting
+        self.min_length = min_length
+        self.slack = slack
+
+        unknown = set(self.operators) - set(OPERATORS)
+        if unknown:
+            raise ValueError(f"Unknown mutation operators: {sorted(unknown)}")
+
+    async def mutate(self, parents, n_children=4):
+        """Create up to `n_children` deduplicated children from the top-k parents
+
+        Args:
+            parents: List of (prompt, score) or (prompt, score, dimensions) tuples,
+                best first. `dimensions` is the judge's per-dimension breakdown.
+            n_children: Number of children to return
+
+        Returns:
+            list: Dicts with "prompt", "operator" and "parents" (provenance)
+        """
+        parents = [tuple(parent) + (None,) * (3 - len(parent)) for parent in parents]
+        if not parents:
+            return []
+
+        # (operator, parents) jobs; unary ones rotate the operator with the parent so
+        # that the first jobs already cover every parent and every operator
+        jobs = [("crossover", parents)] if "crossover" in self.operators and len(parents) >= 2 else []
+        unary = [op for op in self.operators if op != "crossover"]
+        for i in range(len(parents) * len(unary)):
+            parent_idx = i % len(parents)
+            jobs.append((unary[(i // len(parents) + parent_idx) % len(unary)], [parents[parent_idx]]))
+        if not jobs or n_children <= 0:
+            return []
+
+        # Run only the jobs needed, each asked for its share of the wanted prompts
+        wanted = n_children + self.slack
+        jobs = jobs[:wanted]
+        counts = [wanted // len(jobs) + (i < wanted % len(jobs)) for i in range(len(jobs))]
+
+        # One concurrent round-trip for every job
+        results = await asyncio.gather(
+            *(self._run_operator(op, job_parents, count) for (op, job_parents), count in zip(jobs, counts)),
+            return_exceptions=True,
+        )
+
+        candidates = []
+        for (op, job_parents), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                print(f"🔴 Mutation operator '{op}' failed on '{job_parents[0][0][:30]}...': {result}")
+                result = []
+            candidates.append((op, result))
+
+        # Interleave jobs so every operator and parent is represented before any repeats
+        seen = {_normalize(prompt) for prompt, _, _ in parents}
+        children = []
+        for round_idx in range(max(counts)):
+            for op, job_children in candidates:
+                child = job_children[round_idx:round_idx + 1]
+                if not child:
+                    continue
+                prompt, sources = child[0]
+                key = _normalize(prompt)
+                if key in seen:
+                    continue
+                seen.add(key)
+                children.append({"prompt": prompt, "operator": op, "parents": sources})
+                if len(children) >= n_children:
+                    return children
+
+        return children
+
+    async def _run_operator(self, operator, parents, count):
+        """Ask the model for `count` children of one operator; unary operators use `parents[0]`"""
+        best_prompt, best_score, best_dimensions = parents[0]
+
+        if operator == "crossover":
+            sources = [prompt for prompt, _, _ in parents]
+            listing = "\n".join(
+                f'PARENT {i} (Score: {score:.2f}):\n"{prompt}"\n'
+                for i, (prompt, score, _) in enumerate(parents, 1)
+            )
+            instructions = f"""{listing}
+Create exactly {count} new prompts by crossover: each one must combine the strongest
+instructions from at least two of the parents into a single coherent prompt."""
+        elif operator == "targeted_rewrite":
+            sources = [best_prompt]
+            dimension = weakest_dimension(best_dimensions)
+            if dimension:
+                target = f"Its weakest rubric dimension was {dimension.upper()}."
+            else:
+                target = f"First decide which of these rubric dimensions it is weakest on: {', '.join(d.upper() for d in RUBRIC_DIMENSIONS)}."
+            instructions = f"""PROMPT (Score: {best_score:.2f}):
+"{best_prompt}"
+
+{target}
+Create exactly {count} rewrites that specifically fix that weakness while keeping
+everything else that works."""
+        elif operator == "compression":
+            sources = [best_prompt]
+            instructions = f"""PROMPT (Score: {best_score:.2f}):
+"{best_prompt}"
+
+Create exactly {count} compressed versions that keep every instruction that affects
+response quality but use as few words as possible."""
+        else:  # expansion
+            sources = [best_prompt]
+            instructions = f"""PROMPT (Score: {best_score:.2f}):
+"{best_prompt}"
+
+Create exactly {count} expanded versions that add concrete guidance on accuracy,
+clarity, completeness, helpfulness and structure."""
+
+        request = f"""You are an expert in AI prompt engineering, mutating system prompts.
+
+{instructions}
+
+Return only the {count} prompts, one per line."""
+
+        # Room for `count` children about twice as long as the longest parent (~4 chars per token)
+        per_child = max(100, max(len(prompt) for prompt in sources) // 2)
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=min(4096, 100 + count * per_child),
+            messages=[{"role": "user", "content": request}]
+        )
+        if self.ledger:
+            self.ledger.record(response, stage="evolution", prompt=best_prompt)
+
+        lines = response.content[0].text.strip().split('\n')
+        if getattr(response, "stop_reason", None) == "max_tokens":
+            lines = lines[:-1]  # Cut off mid-prompt
+        children = [
+            line.strip().strip('"')
+            for line in lines
+            if line.strip() and len(line.strip()) > self.min_length
+        ]
+        return [(child, sources) for child in children[:count]]
@@ -0,0 +1,90 @@
+# Judge quality dominates; latency and cost break ties between similarly good prompts
+DEFAULT_WEIGHTS = {"quality": 1.0, "latency": 0.15, "cost": 0.15}
+
+RANKINGS = ["quality", "weighted", "pareto"]
+
+
+def generation_metrics(entry, latency_s):
+    """Serving-side metrics of one generation call, reported in rollout metadata
+
+    `entry` is the CostLedger entry recorded for the generation response.
+    """
+    entry = entry or {}
+    return {
+        "latency_s": latency_s,
+        "input_tokens": entry.get("input_tokens", 0),
+        "output_tokens": entry.get("output_tokens", 0),
+        "cost_usd": entry.get("cost_usd", 0.0),
+    }
+
+
+def _dominates(a, b):
+    """True if `a` is at least as good as `b` on every objective and better on one"""
+    at_least = a["quality"] >= b["quality"] and a["latency_s"] <= b["latency_s"] and a["cost_usd"] <= b["cost_usd"]
+    better = a["quality"] > b["quality"] or a["latency_s"] < b["latency_s"] or a["cost_usd"] < b["cost_usd"]
+    return at_least and better
+
+
+def pareto_fronts(candidates):
+    """Split {prompt: metrics} into successive non-dominated fronts (lists of prompts)"""
+    remaining = list(candidates)
+    fronts = []
+    while remaining:
+        front = [
+            p for p in remaining
+            if not any(_dominates(candidates[q], candidates[p]) for q in remaining if q != p)
+        ]
+        fronts.append(front)
+        remaining = [p for p in remaining if p not in front]
+    return fronts
+
+
+def rank_prompts(results, metrics, ranking="weighted", weights=None):
+    """Order (prompt, quality) results by quality, a weighted objective, or Pareto front
+
+    `metrics` maps prompt -> {"quality", "latency_s", "input_tokens", "output_tokens",
+    "cost_usd"}. Prompts without serving metrics (e.g. timeouts) count as slowest and
+    most expensive. Each prompt's metrics gain an "objective", the score the ranking
+    compares (plain quality for "quality"), and "front" for Pareto.
+
+    Returns:
+        list: The same (prompt, quality) tuples, best first
+    """
+    if ranking not in RANKINGS:
+        raise ValueError(f"Unknown ranking '{ranking}', expected one of {RANKINGS}")
+    if ranking == "quality":
+        for prompt, quality in results:
+            metrics.setdefault(prompt, {})["objective"] = quality
+        return sorted(results, key=lambda x: x[1], reverse=True)
+
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    known = [metrics.get(p, {}) for p, _ in results]
+    max_latency = max((m.get("latency_s") or 0.0 for m in known), default=0.0) or 1.0
+    max_cost = max((m.get("cost_usd") or 0.0 for m in known), default=0.0) or 1.0
+
+    candidates = {}
+    for prompt, quality in results:
+        m = metrics.setdefault(prompt, {})
+        candidates[prompt] = {
+            "quality": quality,
+            "latency_s": m.get("latency_s") if m.get("latency_s") is not None else max_latency,
+            "cost_usd": m.get("cost_usd") if m.get("cost_usd") is not None else max_cost,
+        }
+        c = candidates[prompt]
+        # Latency and cost are normalised to the slowest/most expensive candidate
+        m["objective"] = (
+            weights["quality"] * quality
+            + weights["latency"] * (1 - c["latency_s"] / max_latency)
+            + weights["cost"] * (1 - c["cost_usd"] / max_cost)
+        )
+
+    if ranking == "weighted":
+        return sorted(results, key=lambda x: metrics[x[0]]["objective"], reverse=True)
+
+    front_of = {}
+    for index, front in enumerate(pareto_fronts(candidates)):
+        for prompt in front:
+            front_of[prompt] = index
+            metrics[prompt]["front"] = index
+    # Within a front, prefer the better weighted objective
+    return sorted(results, key=lambda x: (front_of[x[0]], -metrics[x[0]]["objective"]))
@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HOST = "127.0.0.1"
+PORT = 9997
+
+BACKEND = f"http://{HOST}:{PORT}"
+
+# Printed by a worker once its agent is built and the server answers it over HTTP
+WORKER_READY = "WORKER_READY"
+
+# Set by WorkerPool; the handshake is skipped when a client is started by hand
+HANDSHAKE_ENV = "EVOLUTION_WORKER_HANDSHAKE"
+
+PIPELINES = {
+    # name: (client script, module with the evolution function, function name)
+    "advanced": ("run_client.py", "main", "run_evolution"),
+    "simple": ("simple_client.py", "simple_main", "simple_evolution"),
+}
+
+
+def wait_for_server(backend=BACKEND, timeout=30, interval=0.2):
+    """Block until the server answers an HTTP request; returns False on timeout
+
+    Any HTTP status counts, since it shows the server application is handling this
+    process's requests (a bare TCP connect only reaches the listening socket).
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(f"{backend}/resources/latest", timeout=1).close()
+            return True
+        except urllib.error.HTTPError:
+            return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+
+def signal_ready(backend=BACKEND, timeout=30):
+    """Worker side of the readiness handshake, a no-op unless spawned by WorkerPool
+
+    Call it once the agent and trainer are built, right before `trainer.fit`.
+    """
+    if not os.environ.get(HANDSHAKE_ENV):
+        return
+    if not wait_for_server(backend, timeout=timeout):
+        raise SystemExit(f"❌ Server at {backend} did not answer within {timeout}s")
+    print(WORKER_READY, flush=True)
+
+
+class WorkerPool:
+    """Spawns client worker processes and waits for their readiness handshake"""
+
+    def __init__(self, script, n_workers=1):
+        self.script = script
+        self.n_workers = n_workers
+        self.processes = []
+        self._readers = []
+        self._ready = []
+
+    async def start(self):
+        # Client scripts live next to this module, whatever the current directory
+        here = os.path.dirname(os.path.abspath(__file__))
+        env = {**os.environ, "PYTHONUNBUFFERED": "1", HANDSHAKE_ENV: "1"}
+        for i in range(self.n_workers):
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.join(here, self.script),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=here,
+                env=env,
+            )
+            ready = asyncio.Event()
+            self.processes.append(process)
+            self._ready.append(ready)
+            self._readers.append(asyncio.create_task(self._relay(i, process, ready)))
+        print(f"🚀 Spawned {self.n_workers} '{self.script}' worker(s)")
+
+    async def _relay(self, index, process, ready):
+        """Echo a worker's output with a prefix, watching for the ready line"""
+        async for raw in process.stdout:
+            line = raw.decode(errors="replace").rstrip()
+            if line == WORKER_READY:
+                ready.set()
+                continue
+            print(f"   [worker {index}] {line}")
+
+    async def wait_ready(self, timeout=60):
+        """Wait until every worker has reported ready; raises if one exits or times out"""
+
+        async def wait_one(index):
+            process = self.processes[index]
+            ready = asyncio.create_task(self._ready[index].wait())
+            exited = asyncio.create_task(process.wait())
+            try:
+                await asyncio.wait({ready, exited}, return_when=asyncio.FIRST_COMPLETED)
+                if not ready.done():
+                    raise RuntimeError(f"Worker {index} exited with code {process.returncode} before becoming ready")
+            finally:
+                ready.cancel()
+                exited.cancel()
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*(wait_one(i) for i in range(self.n_workers))), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Workers not ready after {timeout}s") from None
+
+    async def stop(self, timeout=10):
+        """Terminate every worker, killing the ones that do not exit in time"""
+        for process in self.processes:
+            if process.returncode is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        for reader in self._readers:
+            reader.cancel()
+        print("🛑 Workers stopped")
+
+
+async def run_headless(pipeline="advanced", n_workers=1, ready_timeout=60, budget_usd=None, top_k=2, n_children=4, ranking="weighted"):
+    """Start the server and workers, run one evolution, and shut everything down"""
+    import importlib
+    from agentlightning.server import AgentLightningServer
+
+    script, module_name, function_name = PIPELINES[pipeline]
+    evolve = getattr(importlib.import_module(module_name), function_name)
+
+    started = time.monotonic()
+    timings = {}
+
+    def on_rollout(rollout):
+        timings.setdefault("first_rollout", time.monotonic() - started)
+
+    server = AgentLightningServer(host=HOST, port=PORT)
+    workers = WorkerPool(script, n_workers=n_workers)
+    await server.start()
+    try:
+        await workers.start()
+        await workers.wait_ready(timeout=ready_timeout)
+        timings["workers_ready"] = time.monotonic() - started
+        print(f"✅ {n_workers} worker(s) ready after {timings['workers_ready']:.2f}s")
+
+        result = await evolve(
+            budget_usd=budget_usd, top_k=top_k, n_children=n_children,
+            server=server, on_rollout=on_rollout, max_in_flight=n_workers, ranking=ranking,
+        )
+    finally:
+        await workers.stop()
+        await server.stop()
+
+    if "first_rollout" in timings:
+        print(f"\n⏱️  Startup to first rollout: {timings['first_rollout']:.2f}s")
+    else:
+        print(f"\n⏱️  No rollout completed")
+    return result, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run prompt evolution headless with auto-spawned client workers")
+    parser.add_argument("--pipeline", choices=sorted(PIPELINES), default="advanced")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--ready-timeout", type=float, default=60)
+    parser.add_argument("--budget-usd", type=float, default=None)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--children", type=int, default=4)
+    parser.add_argument("--ranking", choices=["quality", "weighted", "pareto"], default="weighted")
+    args = parser.parse_args()
+
+    asyncio.run(run_headless(
+        pipeline=args.pipeline,
+        n_workers=args.workers,
+        ready_timeout=args.ready_timeout,
+        budget_usd=args.budget_usd,
+        top_k=args.top_k,
+        n_children=args.children,
+        ranking=args.ranking,
+    ))
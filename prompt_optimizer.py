@@ -1,12 +1,15 @@
-import anthropic
 import os
 import re
 
 class PromptOptimizer:
     """Clean prompt optimizer focused on evolution"""
     
-    def __init__(self):
+    def __init__(self, ledger=None):
+        # Deferred so calculate_reward can be imported without the SDK
+        import anthropic
+        
         self.client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        self.ledger = ledger  # Optional CostLedger for token/cost accounting
     
     async def evolve_prompts(self, best_prompt, worst_prompt, best_score, worst_score):
         """Create 2 evolved prompts from best/worst analysis"""
@@ -36,6 +39,8 @@ Return only the 2 prompts, one per line, no extra text."""
             max_tokens=400,
             messages=[{"role": "user", "content": evolution_request}]
         )
+        if self.ledger:
+            self.ledger.record(response, stage="evolution")
         
         evolved_prompts = [
             line.strip().strip('"') 
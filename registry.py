@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import importlib
+import inspect
+import os
+import subprocess
+import sys
+import time
+
+# Rewards are called as reward(response, question, system_prompt="", ledger=None, dimensions=None)
+# -> float; rubric judges fill `dimensions` with their per-dimension scores.
+# Classes are constructed once, on first use; functions are used as they are.
+REWARDS = {
+    "heuristic": "simple_optimizer:calculate_simple_reward",
+    "simple_judge": "advanced_prompt_optimizer:simple_llm_judge_reward",
+    "rubric_judge": "advanced_prompt_optimizer:calculate_advanced_reward",
+    "comparative": "advanced_prompt_optimizer:ComparativeReward",
+}
+
+OPTIMIZERS = {
+    "advanced": "advanced_prompt_optimizer:AdvancedPromptOptimizer",
+    "simple": "simple_optimizer:SimplePromptOptimizer",
+    # Alias: prompt_optimizer.PromptOptimizer only differs from the simple optimizer
+    # in its best/worst evolve_prompts, which the mutation loop does not use
+    "basic": "simple_optimizer:SimplePromptOptimizer",
+}
+
+
+def load(spec):
+    """Import the object named by a 'module:attribute' spec"""
+    module_name, attribute = spec.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class LazyReward:
+    """A reward function that is only imported and constructed on its first call"""
+
+    def __init__(self, name):
+        if name not in REWARDS:
+            raise ValueError(f"Unknown reward '{name}', expected one of {sorted(REWARDS)}")
+        self.name = name
+        self._fn = None
+        self._accepts = None
+
+    def load(self):
+        if self._fn is None:
+            target = load(REWARDS[self.name])
+            self._fn = target() if inspect.isclass(target) else target
+            self._accepts = set(inspect.signature(self._fn).parameters)
+        return self._fn
+
+    def __call__(self, response, question, system_prompt="", ledger=None, dimensions=None):
+        fn = self.load()
+        options = {"system_prompt": system_prompt, "ledger": ledger, "dimensions": dimensions}
+        result = fn(response, question, **{k: v for k, v in options.items() if k in self._accepts})
+        return asyncio.run(result) if inspect.isawaitable(result) else result
+
+
+_rewards = {}
+
+
+def get_reward(name):
+    """Reward registered under `name`; shared per process so it is built only once"""
+    if name not in _rewards:
+        _rewards[name] = LazyReward(name)
+    return _rewards[name]
+
+
+def get_optimizer(name, **kwargs):
+    """Import and construct the optimizer registered under `name`"""
+    if name not in OPTIMIZERS:
+        raise ValueError(f"Unknown optimizer '{name}', expected one of {sorted(OPTIMIZERS)}")
+    return load(OPTIMIZERS[name])(**kwargs)
+
+
+def reward_from_env(default):
+    """Reward name from REWARD_FUNCTION, falling back to the pipeline's default"""
+    return get_reward(os.environ.get("REWARD_FUNCTION") or default)
+
+
+def optimizer_from_env(default, **kwargs):
+    """Optimizer named by PROMPT_OPTIMIZER, falling back to the pipeline's default"""
+    return get_optimizer(os.environ.get("PROMPT_OPTIMIZER") or default, **kwargs)
+
+
+# Run in a fresh interpreter per case; prints seconds to import the client and to its first reward
+_BENCHMARK_CASE = """
+import time
+started = time.perf_counter()
+{preload}
+import {client}
+imported = time.perf_counter() - started
+{first_reward}
+print(imported, time.perf_counter() - started)
+"""
+
+CLIENTS = ["run_client", "simple_client"]
+
+
+def benchmark_startup(repeats=3, call=False):
+    """Time each client worker's cold start with every registered reward
+
+    Each case runs in a fresh interpreter with REWARD_FUNCTION set, measuring the
+    import of the client module and the time until its reward is ready (loaded, or
+    with `call` scored on a sample answer, one API call for the LLM judges). The
+    "eager" rows import every registered module up front, as before the registry.
+    """
+    modules = sorted({spec.split(":")[0] for spec in [*REWARDS.values(), *OPTIMIZERS.values()]})
+    if call:
+        first_reward = "{client}.reward_fn('Data is split into training and test sets. The model learns patterns.', 'How do models learn from data?')"
+    else:
+        first_reward = "{client}.reward_fn.load()"
+
+    cases = {}
+    for client in CLIENTS:
+        for name in REWARDS:
+            cases[(client, name)] = ({"REWARD_FUNCTION": name}, "")
+        cases[(client, "eager")] = ({}, "\n".join(f"import {module}" for module in modules))
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = {}
+    print(f"   {'client':<14} {'reward':<14} {'import':>10} {'first reward':>13}")
+    for (client, name), (env, preload) in cases.items():
+        code = _BENCHMARK_CASE.format(preload=preload, client=client, first_reward=first_reward.format(client=client))
+        best = None
+        for _ in range(repeats):
+            completed = subprocess.run(
+                [sys.executable, "-c", code], cwd=here, capture_output=True, env={**os.environ, **env}
+            )
+            if completed.returncode != 0:
+                best = None
+                break
+            imported, ready = map(float, completed.stdout.decode().split()[-2:])
+            best = (imported, ready) if best is None else (min(best[0], imported), min(best[1], ready))
+        timings[(client, name)] = best
+        if best is None:
+            print(f"   {client:<14} {name:<14}  failed: {completed.stderr.decode().strip().splitlines()[-1]}")
+        else:
+            print(f"   {client:<14} {name:<14} {best[0] * 1000:7.1f} ms {best[1] * 1000:10.1f} ms")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List registered rewards/optimizers or benchmark their startup cost")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--call", action="store_true", help="Time the first reward call too (LLM judges make one API call)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"⏱️  Client startup time per reward (best of {args.repeats})")
+        benchmark_startup(args.repeats, call=args.call)
+    else:
+        print(f"🎯 Rewards:    {', '.join(REWARDS)}")
+        print(f"🧬 Optimizers: {', '.join(OPTIMIZERS)}")
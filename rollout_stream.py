@@ -0,0 +1,232 @@
+import asyncio
+from collections import namedtuple
+
+# status is "completed", "timeout" or "cancelled"; rollout is None unless completed
+RolloutResult = namedtuple("RolloutResult", ["task_id", "rollout", "status"])
+
+
+class RolloutStream:
+    """Delivers completed rollouts in finish order from a single collector
+
+    One background task drains the server's completed-rollout store every `interval`
+    seconds and routes each rollout to the task that produced it, so the number of
+    in-flight tasks does not add pollers. A task that misses its deadline is reported
+    as "timeout" but stays routable for `grace` seconds, so a late rollout still
+    lands in `store` (and `on_late` is called).
+    """
+
+    def __init__(self, server, timeout=20, grace=60, interval=0.2, on_result=None, on_late=None):
+        self.server = server
+        self.timeout = timeout
+        self.grace = grace
+        self.interval = interval
+        self.on_result = on_result  # Called with every RolloutResult as it is delivered
+        self.on_late = on_late  # Called with (task_id, rollout) for rollouts after their deadline
+        self.store = {}  # task_id -> rollout, including late ones
+        self.late = {}  # task_id -> rollout that arrived after its deadline
+        self._queue = asyncio.Queue()
+        self._pending = {}  # task_id -> deadline timer
+        self._overdue = {}  # task_id -> loop time after which a late rollout is ignored
+        self._collector = None
+        self._outstanding = 0
+
+    def submit(self, task_id, timeout=None):
+        """Start waiting for a queued task; `timeout` overrides the default deadline"""
+        loop = asyncio.get_running_loop()
+        self._outstanding += 1
+        self._pending[task_id] = loop.call_later(
+            self.timeout if timeout is None else timeout, self._expire, task_id
+        )
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._collect())
+
+    @property
+    def overdue(self):
+        """Timed out tasks whose late rollout can still arrive (their worker is still busy)"""
+        return set(self._overdue)
+
+    def cancel(self, task_id):
+        """Stop waiting for a task; it is delivered as "cancelled" if still pending"""
+        deadline = self._pending.pop(task_id, None)
+        if deadline:
+            deadline.cancel()
+            self._queue.put_nowait(RolloutResult(task_id, None, "cancelled"))
+
+    def _expire(self, task_id):
+        if self._pending.pop(task_id, None):
+            if self.grace:
+                self._overdue[task_id] = asyncio.get_running_loop().time() + self.grace
+            self._queue.put_nowait(RolloutResult(task_id, None, "timeout"))
+
+    def _route(self, rollout):
+        task_id = rollout.rollout_id
+        self.store[task_id] = rollout
+        deadline = self._pending.pop(task_id, None)
+        if deadline:
+            deadline.cancel()
+            self._queue.put_nowait(RolloutResult(task_id, rollout, "completed"))
+        elif self._overdue.pop(task_id, None) is not None:
+            self.late[task_id] = rollout
+            if self.on_late:
+                self.on_late(task_id, rollout)
+
+    async def _collect(self):
+        """Route completed rollouts until no task is pending or within its grace period"""
+        loop = asyncio.get_running_loop()
+        while self._pending or self._overdue:
+            try:
+                for rollout in await self.server.retrieve_completed_rollouts():
+                    self._route(rollout)
+            except Exception as e:
+                # Deadlines still fire, so a failing server cannot stall results()
+                print(f"🔴 Rollout collector error: {e}")
+
+            now = loop.time()
+            for task_id, expiry in list(self._overdue.items()):
+                if expiry <= now:
+                    del self._overdue[task_id]
+            if self._pending or self._overdue:
+                await asyncio.sleep(self.interval)
+
+    async def results(self):
+        """Yield a RolloutResult for every submitted task, in the order they finish
+
+        Tasks submitted while iterating are picked up too.
+        """
+        while self._outstanding > 0:
+            result = await self._queue.get()
+            self._outstanding -= 1
+            if self.on_result:
+                self.on_result(result)
+            yield result
+
+    async def drain(self, timeout=None):
+        """Wait for the late rollouts of timed out tasks
+
+        Returns once no task is overdue, or after `timeout` seconds (default: `grace`).
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.grace if timeout is None else timeout
+        if self._overdue:
+            print(f"\n🐢 Waiting up to {timeout}s for {len(self._overdue)} late rollout(s)")
+        deadline = loop.time() + timeout
+        while self._overdue and loop.time() < deadline:
+            await asyncio.sleep(self.interval)
+
+    async def aclose(self):
+        """Stop the collector; pending and late rollouts are no longer routed"""
+        for deadline in self._pending.values():
+            deadline.cancel()
+        self._pending.clear()
+        self._overdue.clear()
+        if self._collector:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+
+
+def late_rollout_recorder(ledger, task_prompts, late_results):
+    """`on_late` callback for RolloutStream used by the evolution loops
+
+    Late rollouts still cost money and are kept in the report, just not ranked: their
+    usage is charged to `ledger` under the prompt from `task_prompts` (task_id ->
+    prompt), and (prompt, score) is appended to `late_results`.
+    """
+    def on_late(task_id, rollout):
+        prompt = task_prompts.get(task_id)
+        ledger.add_entries(rollout.metadata.get("usage"), prompt=prompt)
+        late_results.append((prompt, rollout.final_reward))
+        print(f"   🐢 Late result {rollout.final_reward:.2f} for task {task_id}")
+
+    return on_late
+
+
+async def evaluate_prompts(stream, prompts, question, ledger=None, max_in_flight=None, on_rollout=None, task_prompts=None, metrics=None):
+    """Queue each prompt as its own task and collect scores as rollouts finish
+
+    At most `max_in_flight` tasks are outstanding at once (all of them if None); a
+    timed out task counts until its late rollout arrives or its grace period ends. With
+    a budgeted ledger, a single task is queued until a rollout's cost is known, and
+    then only as many as the remaining budget covers at the mean cost so far; no new
+    task is queued once the budget is exhausted. `task_prompts`, if
+    given, is filled with task_id -> prompt so late rollouts can be attributed, and
+    `metrics` with prompt -> quality, the generation's latency and tokens, and the
+    judge's per-dimension scores (None if the reward has none).
+
+    Returns:
+        list: (prompt, score) for every prompt that was queued, in input order.
+              Timed out or cancelled tasks score 0.0.
+    """
+    from agentlightning.types import PromptTemplate
+
+    server = stream.server
+    max_in_flight = max_in_flight or len(prompts)
+    queued = {}
+    scores = {}
+    pending = list(enumerate(prompts))
+    rollout_costs = []
+
+    def in_flight_limit():
+        if not (ledger and ledger.budget_usd):
+            return max_in_flight
+        if not rollout_costs:
+            return 1  # Cost of a rollout unknown yet, spend on one before queueing more
+        mean_cost = sum(rollout_costs) / len(rollout_costs)
+        if mean_cost <= 0:
+            return max_in_flight
+        affordable = int((ledger.budget_usd - ledger.total_cost) / mean_cost)
+        return max(1, min(max_in_flight, affordable))
+
+    def in_flight():
+        # A timed out task still occupies its worker until it finishes or is given up on
+        return len(queued) - len(scores) + len(stream.overdue & queued.keys())
+
+    async def fill():
+        while pending:
+            if ledger and ledger.exhausted:
+                print(f"   💸 Budget reached, not starting more rollouts")
+                pending.clear()
+                return
+            if in_flight() >= in_flight_limit():
+                if len(queued) > len(scores):
+                    return  # Filled again when the next result arrives
+                await asyncio.sleep(stream.interval)  # Only overdue tasks hold the slots
+                continue
+            index, prompt = pending.pop(0)
+            resources_id = await server.update_resources(
+                {"system_prompt": PromptTemplate(template=prompt, engine="f-string")}
+            )
+            task_id = await server.queue_task(sample={"prompt": question}, mode="train", resources_id=resources_id)
+            queued[task_id] = (index, prompt)
+            if task_prompts is not None:
+                task_prompts[task_id] = prompt
+            stream.submit(task_id)
+
+    await fill()
+    async for result in stream.results():
+        if result.task_id not in queued:
+            continue
+        index, prompt = queued[result.task_id]
+        generation, dimensions = {}, None
+        if result.rollout:
+            score = result.rollout.final_reward
+            generation = result.rollout.metadata.get("generation") or {}
+            dimensions = result.rollout.metadata.get("dimensions")
+            if on_rollout:
+                on_rollout(result.rollout)
+            if ledger:
+                spent = ledger.total_cost
+                ledger.add_entries(result.rollout.metadata.get("usage"), prompt=prompt)
+                rollout_costs.append(ledger.total_cost - spent)
+            print(f"   ✅ {score:.2f} - {prompt[:50]}...")
+        else:
+            score = 0.0
+            print(f"   ⏰ {result.status} - {prompt[:50]}...")
+        scores[result.task_id] = score
+        if metrics is not None:
+            metrics[prompt] = {"quality": score, **generation, "dimensions": dimensions}
+        await fill()
+
+    return [
+        (prompt, scores[task_id])
+        for task_id, (index, prompt) in sorted(queued.items(), key=lambda item: item[1][0])
+    ]
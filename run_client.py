@@ -1,42 +1,52 @@
 import dotenv
+import time
 import os
 import anthropic
-import asyncio
 from agentlightning import configure_logger
 from agentlightning.litagent import LitAgent
 from agentlightning.trainer import Trainer
-from advanced_prompt_optimizer import calculate_advanced_reward, simple_llm_judge_reward
+from agentlightning.types import Rollout
+from cost_ledger import CostLedger
+from objectives import generation_metrics
+from orchestrator import signal_ready
+from registry import reward_from_env
+
+# Imported and built on the first rollout; override with REWARD_FUNCTION=simple_judge etc.
+reward_fn = reward_from_env("rubric_judge")
 
 class Agent(LitAgent):
     
     def training_rollout(self, task, rollout_id, resources):
+        ledger = CostLedger()  # Usage is reported back to the server in rollout metadata
+        generation = None  # Latency and tokens of the generation call, for multi-objective ranking
+        dimensions = {}  # Per-dimension judge scores, for targeted rewrites
+        
         try:
             # Get Claude response
             client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
             
+            started = time.perf_counter()
             response = client.messages.create(
                 model="claude-3-haiku-20240307",
                 max_tokens=500,
                 system=resources["system_prompt"].template,
                 messages=[{"role": "user", "content": task["prompt"]}]
             )
+            generation = generation_metrics(ledger.record(response, stage="generation"), time.perf_counter() - started)
             
             answer = response.content[0].text
             print(f"📝 Response: {answer[:100]}...")
             
-            # Choose evaluation method:
-            # Option 1: Advanced detailed evaluation (slower but more comprehensive)
-            reward = asyncio.run(calculate_advanced_reward(answer, task["prompt"], resources["system_prompt"].template))
-            
-            # Option 2: Simple LLM judge (faster, still sophisticated)
-            # reward = asyncio.run(simple_llm_judge_reward(answer, task["prompt"]))
+            # Evaluation method comes from the registry:
+            # "rubric_judge" (detailed, slower), "simple_judge" (faster), "comparative" or "heuristic"
+            reward = reward_fn(answer, task["prompt"], resources["system_prompt"].template, ledger=ledger, dimensions=dimensions)
             
             print(f"🎯 LLM Judge Score: {reward:.2f}")
-            return reward
+            return Rollout(rollout_id=rollout_id, final_reward=reward, metadata={"usage": ledger.entries, "generation": generation, "dimensions": dimensions or None})
             
         except Exception as e:
             print(f"❌ Error: {e}")
-            return 0.0
+            return Rollout(rollout_id=rollout_id, final_reward=0.0, metadata={"usage": ledger.entries, "generation": generation, "dimensions": dimensions or None})
 
 if __name__ == "__main__":
     print("🤖 Client starting...")
@@ -45,4 +55,5 @@ if __name__ == "__main__":
     
     agent = Agent()
     trainer = Trainer(n_workers=1)
+    signal_ready("http://127.0.0.1:9997")  # Readiness handshake when spawned by orchestrator.py
     trainer.fit(agent, backend="http://127.0.0.1:9997")
\ No newline at end of file
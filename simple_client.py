@@ -1,10 +1,18 @@
 import dotenv
 import os
+import time
 import anthropic
 from agentlightning import configure_logger
 from agentlightning.litagent import LitAgent
 from agentlightning.trainer import Trainer
-from simple_optimizer import calculate_simple_reward
+from agentlightning.types import Rollout
+from cost_ledger import CostLedger
+from objectives import generation_metrics
+from orchestrator import signal_ready
+from registry import reward_from_env
+
+# Imported on the first rollout; override with REWARD_FUNCTION=simple_judge etc.
+reward_fn = reward_from_env("heuristic")
 
 class SimpleAgent(LitAgent):
     
@@ -13,30 +21,36 @@ class SimpleAgent(LitAgent):
         print(f"   📋 Question: '{task['prompt']}'")
         print(f"   🎯 System prompt: '{resources['system_prompt'].template}'")
         
+        ledger = CostLedger()  # Usage is reported back to the server in rollout metadata
+        generation = None  # Latency and tokens of the generation call, for multi-objective ranking
+        dimensions = {}  # Per-dimension judge scores, for targeted rewrites
+        
         try:
             # Use Anthropic Claude
             client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
             
             print(f"   🚀 Asking Claude...")
+            started = time.perf_counter()
             response = client.messages.create(
                 model="claude-3-haiku-20240307",
                 max_tokens=300,
                 system=resources["system_prompt"].template,
                 messages=[{"role": "user", "content": task["prompt"]}]
             )
+            generation = generation_metrics(ledger.record(response, stage="generation"), time.perf_counter() - started)
             
             answer = response.content[0].text
             print(f"   💬 Claude answered: '{answer[:50]}...'")
             
             # Calculate reward using our simple system
-            reward = calculate_simple_reward(answer, task["prompt"])
+            reward = reward_fn(answer, task["prompt"], resources["system_prompt"].template, ledger=ledger, dimensions=dimensions)
             print(f"   🎯 Final reward: {reward:.2f}")
             
-            return reward
+            return Rollout(rollout_id=rollout_id, final_reward=reward, metadata={"usage": ledger.entries, "generation": generation, "dimensions": dimensions or None})
             
         except Exception as e:
             print(f"   ❌ Error: {e}")
-            return 0.0
+            return Rollout(rollout_id=rollout_id, final_reward=0.0, metadata={"usage": ledger.entries, "generation": generation, "dimensions": dimensions or None})
 
 if __name__ == "__main__":
     print("🤖 Simple Client Starting...")
@@ -47,4 +61,5 @@ if __name__ == "__main__":
     trainer = Trainer(n_workers=1)  # Just 1 worker to keep it simple
     
     print("🔗 Connecting to server...")
+    signal_ready("http://127.0.0.1:9997")  # Readiness handshake when spawned by orchestrator.py
     trainer.fit(agent, backend="http://127.0.0.1:9997")
\ No newline at end of file
@@ -1,19 +1,36 @@
 import asyncio
+import os
+import time
 from agentlightning.server import AgentLightningServer
-from agentlightning.types import NamedResources, PromptTemplate
-from simple_optimizer import SimplePromptOptimizer
+from agentlightning.types import NamedResources
+from cost_ledger import CostLedger, budget_from_env, write_run_report
+from rollout_stream import RolloutStream, evaluate_prompts, late_rollout_recorder
+from registry import optimizer_from_env
+from objectives import rank_prompts
 
-async def simple_evolution():
-    """Simple 3-step evolution process that's easy to follow"""
+async def simple_evolution(budget_usd=None, top_k=2, n_children=4, server=None, on_rollout=None, max_in_flight=None, ranking="weighted", weights=None):
+    """Simple 3-step evolution process that's easy to follow
+    
+    Takes the same arguments as `run_evolution` in main.py.
+    """
     
     print("🌟 SIMPLE PROMPT EVOLUTION DEMO")
     print("=" * 50)
     
     # Step 1: Setup
     print("\n📋 STEP 1: Setup")
-    server = AgentLightningServer(host="127.0.0.1", port=9997)
-    optimizer = SimplePromptOptimizer()
-    await server.start()
+    owns_server = server is None
+    if owns_server:
+        server = AgentLightningServer(host="127.0.0.1", port=9997)
+    ledger = CostLedger(budget_usd=budget_usd if budget_usd is not None else budget_from_env())
+    optimizer = optimizer_from_env("simple", ledger=ledger)
+    run_dir = os.path.join("runs", time.strftime("%Y%m%d-%H%M%S"))
+    if owns_server:
+        await server.start()
+    late_results = []
+    task_prompts = {}
+    metrics = {}  # prompt -> quality, latency and token counts
+    stream = RolloutStream(server, timeout=15, on_late=late_rollout_recorder(ledger, task_prompts, late_results))
     print("✅ Server started")
     
     # Step 2: Start with 3 prompts (good, bad, medium)
@@ -35,87 +52,92 @@ async def simple_evolution():
     
     # Step 3: Test each prompt and collect scores
     print(f"\n📋 STEP 3: Testing Prompts")
-    results = []
-    
-    for i, prompt in enumerate(prompts):
-        print(f"\n🔬 Testing Prompt {i+1}: '{prompt}'")
-        
-        # Send prompt to client
-        resources = {"system_prompt": PromptTemplate(template=prompt, engine="f-string")}
-        await server.update_resources(resources)
-        
-        # Ask the question
-        task_id = await server.queue_task(sample={"prompt": test_question}, mode="train")
-        print(f"   📤 Sent question to client...")
-        
-        # Get result
-        rollout = await server.poll_completed_rollout(task_id, timeout=15)
-        
-        if rollout:
-            score = rollout.final_reward
-            print(f"   ✅ Got response with score: {score:.2f}")
-            results.append((prompt, score))
-        else:
-            print(f"   ❌ No response (timeout)")
-            results.append((prompt, 0.0))
+    print("🔬 Sending all prompts to the client, scoring as they finish...")
+    results = await evaluate_prompts(
+        stream, prompts, test_question, ledger=ledger,
+        max_in_flight=max_in_flight, on_rollout=on_rollout, task_prompts=task_prompts, metrics=metrics,
+    )
     
     # Step 4: Find best and worst
     print(f"\n📋 STEP 4: Results Analysis")
-    results.sort(key=lambda x: x[1], reverse=True)  # Sort by score, highest first
-    
-    best_prompt, best_score = results[0]
-    worst_prompt, worst_score = results[-1]
+    results = rank_prompts(results, metrics, ranking=ranking, weights=weights)  # Best first
+    print(f"Ranked by {ranking}:")
+    for prompt, score in results:
+        m = metrics.get(prompt, {})
+        if m.get("latency_s") is not None:
+            print(f"   {score:.2f} in {m['latency_s']:.2f}s, {m['input_tokens']}+{m['output_tokens']} tokens - '{prompt[:40]}'")
+        else:
+            print(f"   {score:.2f} (no response) - '{prompt[:40]}'")
     
-    print(f"🏆 BEST:  '{best_prompt}' (Score: {best_score:.2f})")
-    print(f"📉 WORST: '{worst_prompt}' (Score: {worst_score:.2f})")
+    if results:
+        best_prompt, best_score = results[0]
+        worst_prompt, worst_score = results[-1]
+        
+        print(f"🏆 BEST:  '{best_prompt}' (Score: {best_score:.2f})")
+        print(f"📉 WORST: '{worst_prompt}' (Score: {worst_score:.2f})")
     
     # Step 5: Evolve new prompts
     print(f"\n📋 STEP 5: Evolution")
     
-    if best_score > worst_score:
+    operators = {}  # Child prompt -> mutation operator that produced it
+    if not results:
+        print("⏭️  No prompt was tested, skipping evolution")
+        new_prompts = []
+    elif ledger.exhausted:
+        print("💸 Budget reached, skipping evolution")
+        new_prompts = []
+    elif max(s for _, s in results) > min(s for _, s in results):
         print("🧬 Creating improved prompts...")
-        new_prompts = await optimizer.improve_prompt(best_prompt, worst_prompt, best_score, worst_score)
-        
-        print(f"\n✨ NEW EVOLVED PROMPTS:")
-        for i, prompt in enumerate(new_prompts):
-            print(f"  {i+1}. '{prompt}'")
+        ledger.generation = 1
+        parents = [(p, s, metrics.get(p, {}).get("dimensions")) for p, s in results[:top_k]]
+        children = await optimizer.mutate(parents, n_children=n_children)
+        new_prompts = [child["prompt"] for child in children]
+        operators = {child["prompt"]: child["operator"] for child in children}
     else:
         print("⚠️  All prompts performed similarly, no evolution needed")
         new_prompts = []
     
     # Step 6: Test evolved prompts (optional)
+    evolved_results = []
+    ranked = results  # Both generations once evolved prompts are tested
     if new_prompts:
         print(f"\n📋 STEP 6: Testing Evolved Prompts")
         
-        for i, prompt in enumerate(new_prompts):
-            print(f"\n🧪 Testing Evolved Prompt {i+1}: '{prompt[:30]}...'")
-            
-            resources = {"system_prompt": PromptTemplate(template=prompt, engine="f-string")}
-            await server.update_resources(resources)
-            
-            task_id = await server.queue_task(sample={"prompt": test_question}, mode="train")
-            rollout = await server.poll_completed_rollout(task_id, timeout=15)
-            
-            if rollout:
-                score = rollout.final_reward
-                print(f"   ✅ Evolved prompt scored: {score:.2f}")
-                
-                if score > best_score:
-                    print(f"   🎉 IMPROVEMENT! New best score: {score:.2f} (was {best_score:.2f})")
-                else:
-                    print(f"   📊 No improvement (best was still {best_score:.2f})")
-            else:
-                print(f"   ❌ No response")
+        evolved_results = await evaluate_prompts(
+            stream, new_prompts, test_question, ledger=ledger,
+            max_in_flight=max_in_flight, on_rollout=on_rollout, task_prompts=task_prompts, metrics=metrics,
+        )
+        # Rank both generations together so the winner is picked on the same objective
+        ranked = rank_prompts(results + evolved_results, metrics, ranking=ranking, weights=weights)
+        
+        for i, (prompt, score) in enumerate(evolved_results):
+            print(f"\n🧪 Evolved Prompt {i+1}: '{prompt[:30]}...' scored {score:.2f} (objective {metrics[prompt]['objective']:.3f})")
+        
+        winner_prompt, winner_score = ranked[0]
+        print(f"\n🏆 WINNER ({ranking}): '{winner_prompt[:40]}' (Score: {winner_score:.2f})")
+        if winner_prompt in operators:
+            best_initial = next(p for p, _ in ranked if p not in operators)
+            gain = metrics[winner_prompt]["objective"] - metrics[best_initial]["objective"]
+            print(f"   🎉 IMPROVEMENT! An evolved prompt ranks first (objective {gain:+.3f} over the best original)")
+        else:
+            print(f"   📊 No improvement (an original prompt still ranks first)")
+    
+    # Late rollouts still cost money: wait for them before writing the report
+    await stream.drain()
+    await stream.aclose()
+    write_run_report(run_dir, results, evolved_results, late_results, ranked, metrics, operators, ledger)
     
     # Cleanup
     print(f"\n📋 STEP 7: Cleanup")
-    await server.stop()
+    if owns_server:
+        await server.stop()
     print("✅ Demo complete!")
     
     return results, new_prompts
 
 if __name__ == "__main__":
     print("🚀 Make sure 'python run_client.py' is running in another terminal!")
+    print("   (or run 'python orchestrator.py --pipeline simple' to start everything headless)")
     input("Press Enter when ready...")
     
     results, evolved = asyncio.run(simple_evolution())
@@ -123,5 +145,5 @@ if __name__ == "__main__":
     print(f"\n🎊 SUMMARY:")
     print(f"   Tested: {len(results)} original prompts")
     print(f"   Evolved: {len(evolved)} new prompts") 
-    print(f"   Best score: {max(r[1] for r in results):.2f}")
+    print(f"   Best score: {max((r[1] for r in results), default=0.0):.2f}")
     print("=" * 50)
\ No newline at end of file
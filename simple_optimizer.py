@@ -1,14 +1,30 @@
-import anthropic
 import os
 import re
 
 class SimplePromptOptimizer:
     """Simple prompt optimizer that's easy to understand"""
     
-    def __init__(self):
+    def __init__(self, ledger=None):
+        # Imported here so the heuristic reward below loads without the SDK
+        import anthropic
+        from mutation_engine import MutationEngine
+        
         self.client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        self.ledger = ledger  # Optional CostLedger for token/cost accounting
+        self.mutation_engine = MutationEngine(model="claude-3-haiku-20240307", ledger=ledger, min_length=20)
         print("✨ Simple Optimizer initialized")
     
+    async def mutate(self, parents, n_children=4):
+        """Mutate the top-k parents with the Haiku mutation engine, printing each child"""
+        print(f"\n🧬 Mutating top {len(parents)} prompts with {', '.join(self.mutation_engine.operators)}...")
+        children = await self.mutation_engine.mutate(parents, n_children=n_children)
+        
+        print(f"✅ Generated {len(children)} children:")
+        for i, child in enumerate(children):
+            print(f"   {i+1}. [{child['operator']}] '{child['prompt'][:40]}...'")
+        
+        return children
+    
     async def improve_prompt(self, best_prompt, worst_prompt, best_score, worst_score):
         """Take the best and worst prompt, create 2 improved versions"""
         print(f"\n🔬 Analyzing prompts...")
@@ -37,6 +53,8 @@ Return only the 2 new prompts, one per line."""
             max_tokens=500,
             messages=[{"role": "user", "content": improvement_request}]
         )
+        if self.ledger:
+            self.ledger.record(response, stage="evolution")
         
         improved_prompts = [line.strip().strip('"') for line in response.content[0].text.strip().split('\n') if line.strip()]
         
@@ -0,0 +1,96 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from cost_ledger import CostLedger, budget_from_env, prompt_id, usage_cost, write_run_report
+
+HAIKU = "claude-3-haiku-20240307"
+
+
+def response(input_tokens, output_tokens, model=HAIKU):
+    usage = SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens)
+    return SimpleNamespace(model=model, usage=usage)
+
+
+def test_record_prices_usage_and_skips_responses_without_it():
+    ledger = CostLedger()
+
+    entry = ledger.record(response(1_000_000, 1_000_000), stage="judge", prompt="p")
+
+    assert entry["cost_usd"] == pytest.approx(0.25 + 1.25)
+    assert entry["prompt_id"] == prompt_id("p")
+    assert ledger.record(SimpleNamespace(), stage="judge") is None
+    assert usage_cost("unknown-model", input_tokens=10) == 0.0
+
+
+def test_summary_groups_by_stage_prompt_and_generation():
+    ledger = CostLedger()
+    ledger.record(response(100, 10), stage="evolution")
+    ledger.generation = 1
+    ledger.add_entries([{"stage": "generation", "input_tokens": 5, "cost_usd": 0.5}], prompt="child")
+    ledger.add_entries([{"stage": "generation", "input_tokens": 7, "cost_usd": 0.25}], prompt="child")
+
+    summary = ledger.summary()
+
+    assert summary["total_cost_usd"] == pytest.approx(ledger.total_cost)
+    assert summary["by_stage"]["generation"]["calls"] == 2
+    assert summary["by_stage"]["generation"]["input_tokens"] == 12
+    assert summary["by_prompt"][prompt_id("child")]["cost_usd"] == pytest.approx(0.75)
+    assert summary["by_prompt"]["None"]["calls"] == 1
+    assert set(summary["by_generation"]) == {"0", "1"}
+
+
+def test_exhausted_only_with_a_budget():
+    unlimited = CostLedger()
+    unlimited.add_entries([{"cost_usd": 1000.0}])
+    assert not unlimited.exhausted
+
+    ledger = CostLedger(budget_usd=1.0)
+    ledger.add_entries([{"cost_usd": 0.6}])
+    assert not ledger.exhausted
+    ledger.add_entries([{"cost_usd": 0.4}])
+    assert ledger.exhausted
+    assert ledger.summary()["budget_exhausted"]
+
+
+@pytest.mark.parametrize("budget", [0, -1.5])
+def test_non_positive_budget_is_rejected(budget):
+    with pytest.raises(ValueError):
+        CostLedger(budget_usd=budget)
+
+
+def test_budget_from_env(monkeypatch):
+    monkeypatch.delenv("EVOLUTION_BUDGET_USD", raising=False)
+    assert budget_from_env() is None
+    monkeypatch.setenv("EVOLUTION_BUDGET_USD", "")
+    assert budget_from_env() is None
+    monkeypatch.setenv("EVOLUTION_BUDGET_USD", "2.5")
+    assert budget_from_env() == 2.5
+    monkeypatch.setenv("EVOLUTION_BUDGET_USD", "0")
+    with pytest.raises(ValueError):
+        budget_from_env()
+
+
+def test_write_run_report(tmp_path):
+    ledger = CostLedger()
+    ledger.add_entries([{"stage": "generation", "cost_usd": 0.1}])
+    metrics = {"a": {"objective": 0.5}, "child": {"objective": 0.9}}
+
+    write_run_report(
+        str(tmp_path), [("a", 0.5)], [("child", 0.8)], [("late", 0.2)],
+        [("child", 0.8), ("a", 0.5)], metrics, {"child": "compression"}, ledger,
+    )
+
+    scores = json.loads((tmp_path / "scores.json").read_text())
+    assert scores["initial"] == [{"prompt": "a", "score": 0.5, "objective": 0.5}]
+    assert scores["evolved"][0]["operator"] == "compression"
+    assert scores["late"] == [{"prompt": "late", "score": 0.2}]
+    assert scores["winner"]["prompt"] == "child"
+    assert json.loads((tmp_path / "cost_report.json").read_text())["total_cost_usd"] == pytest.approx(0.1)
+
+
+def test_write_run_report_without_results(tmp_path):
+    write_run_report(str(tmp_path), [], [], [], [], {}, {}, CostLedger())
+
+    assert json.loads((tmp_path / "scores.json").read_text())["winner"] is None
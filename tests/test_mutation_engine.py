@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+from mutation_engine import MutationEngine, weakest_dimension
+
+
+class FakeMessages:
+    """Answers each request with the asked-for number of children, or a fixed reply"""
+
+    def __init__(self, replies=None, stop_reason="end_turn"):
+        self.replies = replies or {}
+        self.stop_reason = stop_reason
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        content = kwargs["messages"][0]["content"]
+        operator = next(op for op in ("crossover", "weakest", "compressed", "expanded") if op in content)
+        if operator in self.replies:
+            text = self.replies[operator]
+        else:
+            count = int(content.split("Return only the ")[1].split()[0])
+            text = "\n".join(f"{operator} child {len(self.requests)}.{i} with enough words to count" for i in range(count))
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], stop_reason=self.stop_reason, usage=None)
+
+
+def make_engine(operators=None, **kwargs):
+    messages = FakeMessages(**kwargs)
+    return MutationEngine(operators=operators, client=SimpleNamespace(messages=messages)), messages
+
+
+PARENTS = [
+    ("first parent prompt that scored best", 0.9, {"clarity": 8, "accuracy": 15}),
+    ("second parent prompt that scored next", 0.6, None),
+]
+
+
+def test_only_needed_calls_cover_every_parent():
+    engine, messages = make_engine()
+
+    children = asyncio.run(engine.mutate(PARENTS, n_children=4))
+
+    # 4 children plus 1 spare, one prompt per call
+    assert len(messages.requests) == 5
+    assert len(children) == 4
+    assert children[0]["operator"] == "crossover"
+    assert children[0]["parents"] == [PARENTS[0][0], PARENTS[1][0]]
+    assert {tuple(child["parents"]) for child in children[1:]} == {(PARENTS[0][0],), (PARENTS[1][0],)}
+
+
+def test_counts_are_shared_across_all_jobs():
+    engine, messages = make_engine()
+
+    children = asyncio.run(engine.mutate(PARENTS, n_children=10))
+
+    asked = [int(r["messages"][0]["content"].split("Return only the ")[1].split()[0]) for r in messages.requests]
+    assert len(messages.requests) == 7
+    assert sum(asked) == 11
+    assert len(children) == 10
+
+
+def test_duplicates_of_parents_and_children_are_dropped():
+    duplicate = "First parent prompt   that scored BEST"
+    engine, _ = make_engine(replies={
+        "compressed": duplicate,
+        "expanded": "an expanded child with enough words to count",
+        "weakest": "An expanded child with enough words to count",
+    })
+
+    children = asyncio.run(engine.mutate(PARENTS[:1], n_children=3))
+
+    assert [child["operator"] for child in children] == ["targeted_rewrite"]
+
+
+def test_truncated_last_line_is_dropped():
+    reply = "a complete compressed child with enough words\na compressed child cut off in the mid"
+    engine, _ = make_engine(operators=["compression"], replies={"compressed": reply}, stop_reason="max_tokens")
+
+    children = asyncio.run(engine.mutate(PARENTS[:1], n_children=2))
+
+    assert [child["prompt"] for child in children] == ["a complete compressed child with enough words"]
+
+
+def test_targeted_rewrite_names_weakest_dimension():
+    engine, messages = make_engine()
+
+    asyncio.run(engine.mutate(PARENTS[:1], n_children=1))
+
+    assert "Its weakest rubric dimension was CLARITY." in messages.requests[0]["messages"][0]["content"]
+    assert weakest_dimension({"clarity": {"score": 12}, "structure": {"score": 9}}) == "structure"
+    assert weakest_dimension(None) is None
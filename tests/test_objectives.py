@@ -0,0 +1,89 @@
+import pytest
+
+from objectives import _dominates, generation_metrics, pareto_fronts, rank_prompts
+
+
+def point(quality, latency_s, cost_usd):
+    return {"quality": quality, "latency_s": latency_s, "cost_usd": cost_usd}
+
+
+def test_dominates_needs_one_strictly_better_objective():
+    assert _dominates(point(0.9, 1.0, 0.01), point(0.8, 1.0, 0.01))
+    assert _dominates(point(0.8, 0.5, 0.01), point(0.8, 1.0, 0.01))
+    assert not _dominates(point(0.8, 1.0, 0.01), point(0.8, 1.0, 0.01))
+    assert not _dominates(point(0.9, 2.0, 0.01), point(0.8, 1.0, 0.01))
+
+
+def test_pareto_fronts_peel_non_dominated_layers():
+    candidates = {
+        "best": point(0.9, 1.0, 0.01),
+        "fast": point(0.7, 0.2, 0.01),
+        "worse": point(0.6, 1.5, 0.02),
+    }
+
+    assert pareto_fronts(candidates) == [["best", "fast"], ["worse"]]
+    assert pareto_fronts({}) == []
+
+
+def test_generation_metrics_without_ledger_entry():
+    assert generation_metrics(None, 1.5) == {"latency_s": 1.5, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+
+
+def test_quality_ranking_sets_quality_as_objective():
+    metrics = {"a": {"latency_s": 9.0}}
+
+    ranked = rank_prompts([("a", 0.4), ("b", 0.8)], metrics, ranking="quality")
+
+    assert ranked == [("b", 0.8), ("a", 0.4)]
+    assert metrics["a"]["objective"] == 0.4 and metrics["b"]["objective"] == 0.8
+
+
+def test_weighted_ranking_trades_quality_for_latency_and_cost():
+    metrics = {
+        "verbose": {"latency_s": 4.0, "cost_usd": 0.004},
+        "short": {"latency_s": 1.0, "cost_usd": 0.001},
+    }
+
+    ranked = rank_prompts([("verbose", 0.82), ("short", 0.80)], metrics)
+
+    assert [p for p, _ in ranked] == ["short", "verbose"]
+    assert metrics["verbose"]["objective"] == pytest.approx(0.82)
+    assert metrics["short"]["objective"] == pytest.approx(0.80 + 0.15 * 0.75 + 0.15 * 0.75)
+
+
+def test_missing_metrics_count_as_slowest_and_most_expensive():
+    # A timed out prompt has no serving metrics at all
+    metrics = {"ok": {"latency_s": 2.0, "cost_usd": 0.002}}
+
+    ranked = rank_prompts([("timeout", 0.0), ("ok", 0.5)], metrics)
+
+    assert ranked[0][0] == "ok"
+    assert metrics["timeout"]["objective"] == pytest.approx(0.0)
+
+
+def test_zero_latency_and_cost_do_not_divide_by_zero():
+    metrics = {"a": {"latency_s": 0.0, "cost_usd": 0.0}, "b": {"latency_s": 0.0, "cost_usd": 0.0}}
+
+    ranked = rank_prompts([("a", 0.5), ("b", 0.6)], metrics, weights={"latency": 0.5})
+
+    assert ranked == [("b", 0.6), ("a", 0.5)]
+    assert metrics["b"]["objective"] == pytest.approx(0.6 + 0.5 + 0.15)
+
+
+def test_pareto_ranking_breaks_ties_inside_a_front_by_objective():
+    metrics = {
+        "quality": {"latency_s": 4.0, "cost_usd": 0.004},
+        "fast": {"latency_s": 1.0, "cost_usd": 0.001},
+        "dominated": {"latency_s": 4.0, "cost_usd": 0.004},
+    }
+
+    ranked = rank_prompts([("quality", 0.9), ("dominated", 0.7), ("fast", 0.85)], metrics, ranking="pareto")
+
+    # "fast" and "quality" share front 0; "fast" has the better weighted objective
+    assert [p for p, _ in ranked] == ["fast", "quality", "dominated"]
+    assert [metrics[p]["front"] for p, _ in ranked] == [0, 0, 1]
+
+
+def test_unknown_ranking_is_rejected():
+    with pytest.raises(ValueError):
+        rank_prompts([], {}, ranking="speed")
@@ -0,0 +1,165 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from cost_ledger import CostLedger
+from rollout_stream import RolloutStream, evaluate_prompts
+
+
+class FakeServer:
+    """Completes every queued task after `delays[i]` seconds with a fixed reward and cost"""
+
+    def __init__(self, delays=None, cost_usd=0.02):
+        self.delays = delays or {}
+        self.cost_usd = cost_usd
+        self.queued = []
+        self.queued_at = []
+        self.completed = []
+
+    async def update_resources(self, resources):
+        return f"res-{len(self.queued)}"
+
+    async def queue_task(self, sample=None, mode="train", resources_id=None):
+        loop = asyncio.get_running_loop()
+        task_id = f"task-{len(self.queued)}"
+        index = len(self.queued)
+        self.queued.append(task_id)
+        self.queued_at.append(loop.time())
+        rollout = SimpleNamespace(
+            rollout_id=task_id,
+            final_reward=index / 10,
+            metadata={"usage": [{"stage": "generation", "cost_usd": self.cost_usd}]},
+        )
+        loop.call_later(self.delays.get(index, 0.01), self._complete, rollout)
+        return task_id
+
+    def _complete(self, rollout):
+        self.completed.append(rollout)
+
+    async def retrieve_completed_rollouts(self):
+        completed, self.completed = self.completed, []
+        return completed
+
+
+def test_stream_delivers_in_finish_order():
+    server = FakeServer(delays={0: 0.05, 1: 0.01})
+
+    async def run():
+        stream = RolloutStream(server, timeout=1, interval=0.005)
+        for _ in range(2):
+            stream.submit(await server.queue_task())
+        results = [result async for result in stream.results()]
+        await stream.aclose()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [(r.task_id, r.status) for r in results] == [("task-1", "completed"), ("task-0", "completed")]
+
+
+def test_drain_routes_late_rollouts_of_timed_out_tasks():
+    server = FakeServer(delays={0: 0.1})
+    late = {}
+
+    async def run():
+        stream = RolloutStream(server, timeout=0.02, grace=1, interval=0.005, on_late=late.__setitem__)
+        stream.submit(await server.queue_task())
+        results = [result async for result in stream.results()]
+        overdue = stream.overdue
+        await stream.drain()
+        remaining = stream.overdue
+        await stream.aclose()
+        return results, overdue, remaining, stream
+
+    results, overdue, remaining, stream = asyncio.run(run())
+
+    assert [r.status for r in results] == ["timeout"]
+    assert overdue == {"task-0"} and remaining == set()
+    assert stream.late["task-0"] is late["task-0"] is stream.store["task-0"]
+
+
+def test_drain_gives_up_after_timeout():
+    server = FakeServer(delays={0: 5})
+
+    async def run():
+        stream = RolloutStream(server, timeout=0.01, grace=10, interval=0.005)
+        stream.submit(await server.queue_task())
+        [result async for result in stream.results()]
+        await stream.drain(timeout=0.05)
+        overdue = stream.overdue
+        await stream.aclose()
+        return overdue
+
+    assert asyncio.run(run()) == {"task-0"}
+
+
+def test_cancel_delivers_cancelled_once():
+    server = FakeServer(delays={0: 5})
+
+    async def run():
+        stream = RolloutStream(server, timeout=10, interval=0.005)
+        task_id = await server.queue_task()
+        stream.submit(task_id)
+        stream.cancel(task_id)
+        stream.cancel(task_id)
+        results = [result async for result in stream.results()]
+        await stream.aclose()
+        return results
+
+    assert [r.status for r in asyncio.run(run())] == ["cancelled"]
+
+
+def test_budget_stops_queueing_partway_through_batch():
+    pytest.importorskip("agentlightning")
+    server = FakeServer(cost_usd=0.02)
+    ledger = CostLedger(budget_usd=0.05)
+    prompts = [f"prompt {i}" for i in range(10)]
+
+    async def run():
+        stream = RolloutStream(server, timeout=5, interval=0.005)
+        results = await evaluate_prompts(stream, prompts, "question", ledger=ledger)
+        await stream.aclose()
+        return results
+
+    results = asyncio.run(run())
+
+    assert 0 < len(server.queued) < len(prompts)
+    assert len(results) == len(server.queued)
+    assert ledger.total_cost < ledger.budget_usd + server.cost_usd
+
+
+def test_overdue_task_keeps_its_slot_until_late_rollout():
+    pytest.importorskip("agentlightning")
+    # Task 0 misses its deadline at 0.05s but its worker is busy until 0.2s
+    server = FakeServer(delays={0: 0.2})
+
+    async def run():
+        stream = RolloutStream(server, timeout=0.05, grace=1, interval=0.005)
+        results = await evaluate_prompts(stream, ["a", "b"], "question", max_in_flight=1)
+        await stream.aclose()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [("a", 0.0), ("b", 0.1)]
+    assert server.queued_at[1] - server.queued_at[0] >= 0.2
+
+
+def test_results_in_input_order_and_late_rollouts_kept():
+    pytest.importorskip("agentlightning")
+    # Task 0 finishes last and misses its deadline
+    server = FakeServer(delays={0: 0.2, 1: 0.05, 2: 0.01})
+    late = {}
+
+    async def run():
+        stream = RolloutStream(server, timeout=0.1, grace=1, interval=0.005, on_late=late.__setitem__)
+        results = await evaluate_prompts(stream, ["a", "b", "c"], "question")
+        await stream.drain()
+        await stream.aclose()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [("a", 0.0), ("b", 0.1), ("c", 0.2)]
+    assert list(late) == ["task-0"]